@@ -1,9 +1,9 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from itertools import chain
 from logging import getLogger
-from typing import TYPE_CHECKING, Optional, TypeVar, Union
+from re import compile as re_compile
+from typing import TYPE_CHECKING, Final, Optional, TypeVar, Union
 
 from .children import HConfigChildren
 from .exceptions import DuplicateChildError
@@ -22,15 +22,26 @@ if TYPE_CHECKING:
 
 logger = getLogger(__name__)
 
+_ACL_STARTSWITH: Final = ("ip access-list ", "ipv4 access-list ", "ipv6 access-list ")
+
 
 class HConfigBase(ABC):  # noqa: PLR0904
-    __slots__ = ("children",)
+    # Subclasses must declare __slots__ as well, otherwise every node gets a __dict__
+    __slots__ = ("_descendant_count", "_hash", "_tags_cache", "children")
 
     def __init__(self) -> None:
-        self.children = HConfigChildren()
+        self.children = HConfigChildren(self)
+        # Lazily computed by __len__ and cleared by _subtree_changed()
+        self._descendant_count: Optional[int] = None
+        # Cached by __hash__ and cleared by _hash_changed() or _subtree_changed()
+        self._hash: Optional[int] = None
+        # Cached by tags and cleared by _tags_changed() or _subtree_changed()
+        self._tags_cache: Optional[frozenset[str]] = None
 
     def __len__(self) -> int:
-        return len(tuple(self.all_children()))
+        if self._descendant_count is None:
+            self._descendant_count = sum(len(child) + 1 for child in self.children)
+        return self._descendant_count
 
     def __bool__(self) -> bool:
         return True
@@ -60,6 +71,23 @@ class HConfigBase(ABC):  # noqa: PLR0904
     def depth(self) -> int:
         pass
 
+    def _subtree_changed(self) -> None:
+        """Clear cached aggregates of the subtree after children were added or removed.
+
+        HConfigChildren calls this on its owner for every structural change.
+        """
+        self._descendant_count = None
+        self._hash = None
+        self._tags_cache = None
+
+    def _hash_changed(self) -> None:
+        """Clear the cached hash after a descendant changed in place."""
+        self._hash = None
+
+    def _tags_changed(self) -> None:
+        """Clear the cached tags after the tags of a descendant changed."""
+        self._tags_cache = None
+
     def add_children(self, lines: Iterable[str]) -> None:
         """Add child instances of HConfigChild."""
         for line in lines:
@@ -77,10 +105,12 @@ class HConfigBase(ABC):  # noqa: PLR0904
             message = "text was empty"
             raise ValueError(message)
 
-        if check_if_present and (child := self.children.get(text)):
+        children = self.children
+        # A single mapping lookup, compared to None to skip HConfigBase.__bool__
+        if check_if_present and (child := children.get(text)) is not None:
             if self._is_duplicate_child_allowed():
                 new_child = self.instantiate_child(text)
-                self.children.append(new_child, update_mapping=False)
+                children.append(new_child, update_mapping=False)
                 return new_child
             if return_if_present:
                 return child
@@ -88,7 +118,7 @@ class HConfigBase(ABC):  # noqa: PLR0904
             raise DuplicateChildError(message)
 
         new_child = self.instantiate_child(text)
-        self.children.append(new_child)
+        children.append(new_child)
         return new_child
 
     def path(self) -> Iterator[str]:  # noqa: PLR6301
@@ -99,25 +129,106 @@ class HConfigBase(ABC):  # noqa: PLR0904
         child_to_add: HConfigChild,
         *,
         merged: bool = False,
+        check_if_present: bool = True,
     ) -> HConfigChild:
         """Add a nested copy of a child to self."""
-        new_child = self.add_shallow_copy_of(child_to_add, merged=merged)
-        for child in child_to_add.children:
-            new_child.add_deep_copy_of(child, merged=merged)
-
+        new_child = self.add_shallow_copy_of(
+            child_to_add, merged=merged, check_if_present=check_if_present
+        )
+        new_child._add_deep_copies_of(child_to_add.children, merged=merged)  # noqa: SLF001
         return new_child
 
+    def _add_deep_copies_of(
+        self,
+        children_to_add: Iterable[HConfigChild],
+        *,
+        merged: bool = False,
+    ) -> None:
+        """Add nested copies of children whose texts self does not have yet.
+
+        The copies of each set of siblings are added with a single extend(),
+        rather than with the duplicate checks that add_child() makes for every
+        line. Siblings with repeated texts are only copied where the parent
+        allows duplicate children, otherwise DuplicateChildError is raised.
+        """
+        stack = [(self, children_to_add)]
+        while stack:
+            parent, sources = stack.pop()
+            # Sibling texts only repeat if some of them are left out of _mapping
+            if (
+                not isinstance(sources, HConfigChildren)
+                or len(sources) != len(sources._mapping)  # noqa: SLF001
+            ) and not parent._is_duplicate_child_allowed():  # noqa: SLF001
+                seen: set[str] = set()
+                for source in sources:
+                    if source.text in seen:
+                        message = f"Found a duplicate section: {(*parent.path(), source.text)}"
+                        raise DuplicateChildError(message)
+                    seen.add(source.text)
+            copies: list[HConfigChild] = []
+            for source in sources:
+                copy = parent.instantiate_child(source.text)
+                if merged:
+                    copy.instances.append(source.instance)
+                copy.comments.update(source.comments)
+                # copy is not a member of parent.children yet, so there is no
+                # cached order or hash to invalidate
+                copy._order_weight = source._order_weight  # noqa: SLF001
+                if source.children:
+                    stack.append((copy, source.children))
+                else:
+                    copy._tags.update(source._tags)  # noqa: SLF001
+                copies.append(copy)
+            parent.children.extend(copies)
+
+    def _descendant_lines(self, *, sectional_exiting: bool) -> Iterator[str]:
+        """Yield the config lines of all descendants, sorted at each hierarchy."""
+        indentation = self.driver.rules.indentation
+        # Each section stays on the stack until its exit text is emitted.
+        # self is not a section of its own, its exit text is up to the caller.
+        stack: list[tuple[Optional[HConfigChild], Iterator[HConfigChild]]] = [
+            (None, iter(self.children.sorted_data())),
+        ]
+        while stack:
+            section, children = stack[-1]
+            for child in children:
+                yield child.cisco_style_text()
+                stack.append((child, iter(child.children.sorted_data())))
+                break
+            else:
+                stack.pop()
+                if (
+                    sectional_exiting
+                    and section is not None
+                    and (exit_text := section.sectional_exit)
+                ):
+                    yield " " * indentation * section.depth() + exit_text
+
     def all_children_sorted(self) -> Iterator[HConfigChild]:
         """Recursively find and yield all children sorted at each hierarchy."""
-        for child in sorted(self.children):
-            yield child
-            yield from child.all_children_sorted()
+        # An explicit stack avoids a nested generator per level of the tree
+        stack: list[Iterator[HConfigChild]] = [iter(self.children.sorted_data())]
+        while stack:
+            for child in stack[-1]:
+                yield child
+                if child.children:
+                    stack.append(iter(child.children.sorted_data()))
+                    break
+            else:
+                stack.pop()
 
     def all_children(self) -> Iterator[HConfigChild]:
         """Recursively find and yield all children at each hierarchy."""
-        for child in self.children:
-            yield child
-            yield from child.all_children()
+        # An explicit stack avoids a nested generator per level of the tree
+        stack: list[Iterator[HConfigChild]] = [iter(self.children)]
+        while stack:
+            for child in stack[-1]:
+                yield child
+                if child.children:
+                    stack.append(iter(child.children))
+                    break
+            else:
+                stack.pop()
 
     def get_child_deep(
         self, match_rules: tuple[MatchRule, ...]
@@ -154,6 +265,13 @@ class HConfigBase(ABC):  # noqa: PLR0904
         re_search: Optional[str] = None,
     ) -> Optional[HConfigChild]:
         """Find a child by text_match rule. If it is not found, return None."""
+        # Exact text matches are a plain mapping lookup, skip the generator
+        if (
+            isinstance(equals, str)
+            and startswith is endswith is contains is re_search is None
+        ):
+            return self.children.get(equals)
+
         return next(
             self.get_children(
                 equals=equals,
@@ -192,8 +310,9 @@ class HConfigBase(ABC):  # noqa: PLR0904
             and equals is endswith is contains is re_search is None
         ):
             duplicates_allowed = None
-            for index, child in enumerate(self.children):
-                if child.text.startswith(startswith):
+            children = self.children
+            for index, (text, child) in enumerate(zip(children.texts(), children)):
+                if text.startswith(startswith):
                     yield child
                     if duplicates_allowed is None:
                         duplicates_allowed = self._is_duplicate_child_allowed()
@@ -203,13 +322,15 @@ class HConfigBase(ABC):  # noqa: PLR0904
             else:
                 return
 
+        # Compile the pattern once rather than once per child
+        pattern = None if re_search is None else re_compile(re_search)
         for child in self.children[children_slice]:
             if child.is_match(
                 equals=equals,
                 startswith=startswith,
                 endswith=endswith,
                 contains=contains,
-                re_search=re_search,
+                re_search=pattern,
             ):
                 yield child
 
@@ -218,15 +339,16 @@ class HConfigBase(ABC):  # noqa: PLR0904
         child_to_add: HConfigChild,
         *,
         merged: bool = False,
+        check_if_present: bool = True,
     ) -> HConfigChild:
         """Add a nested copy of a child_to_add to self.children."""
-        new_child = self.add_child(child_to_add.text)
+        new_child = self.add_child(child_to_add.text, check_if_present=check_if_present)
 
         if merged:
             new_child.instances.append(child_to_add.instance)
         new_child.comments.update(child_to_add.comments)
         new_child.order_weight = child_to_add.order_weight
-        if child_to_add.is_leaf:
+        if not child_to_add.children:
             new_child.tags_add(child_to_add.tags)
 
         return new_child
@@ -240,12 +362,15 @@ class HConfigBase(ABC):  # noqa: PLR0904
         provides a similar output to difflib.unified_diff()
         """
         # if a self child is missing from the target "- self_child.text"
+        target_children = target.children
         for self_child in self.children:
-            self_iter = iter((f"{self_child.indentation}{self_child.text}",))
-            if target_child := target.children.get(self_child.text, None):
+            if target_child := target_children.get(self_child.text, None):
                 found = self_child.unified_diff(target_child)
+                # Only render the parent line when a descendant differs
                 if peek := next(found, None):
-                    yield from chain(self_iter, (peek,), found)
+                    yield f"{self_child.indentation}{self_child.text}"
+                    yield peek
+                    yield from found
             else:
                 yield f"{self_child.indentation}- {self_child.text}"
                 yield from (
@@ -253,8 +378,9 @@ class HConfigBase(ABC):  # noqa: PLR0904
                     for c in self_child.all_children_sorted()
                 )
         # if a target child is missing from self "+ target_child.text"
-        for target_child in target.children:
-            if target_child.text not in self.children:
+        self_children = self.children
+        for target_child in target_children:
+            if target_child.text not in self_children:
                 yield f"{target_child.indentation}+ {target_child.text}"
                 yield from (
                     f"{c.indentation}+ {c.text}"
@@ -266,10 +392,12 @@ class HConfigBase(ABC):  # noqa: PLR0904
     ) -> tuple[set[str], set[str]]:
         negated_or_recursed: set[str] = set()
         config_children_ignore: set[str] = set()
+        negate_with = self.root.driver.negate_with
+        config_get_child = config.get_child
         for self_child in self.children:
             # Is the command effectively negating a command in self.children?
-            if (negation_text := self.root.driver.negate_with(self_child)) and (
-                config_child := config.get_child(equals=negation_text)
+            if (negation_text := negate_with(self_child)) and (
+                config_child := config_get_child(equals=negation_text)
             ):
                 negated_or_recursed.add(self_child.text)
                 config_children_ignore.add(config_child.text)
@@ -286,9 +414,19 @@ class HConfigBase(ABC):  # noqa: PLR0904
         - and likely others.
         """
         negated_or_recursed, config_children_ignore = self._future_pre(config)
+        # Bind hot attribute lookups once rather than on every iteration
+        driver = self.root.driver
+        negation_prefix = driver.negation_prefix
+        idempotent_for = driver.idempotent_for
+        self_children = self.children
+        # Exact text lookups go straight to the mapping, like get_child(equals=...)
+        get_self_child = self_children.get
+        add_deep_copy_of = future_config.add_deep_copy_of
+        add_shallow_copy_of = future_config.add_shallow_copy_of
 
         for config_child in config.children:
-            if config_child.text in config_children_ignore:
+            text = config_child.text
+            if text in config_children_ignore:
                 continue
             # sectional_overwrite
             # sectional_overwrite_no_negate
@@ -296,42 +434,37 @@ class HConfigBase(ABC):  # noqa: PLR0904
                 config_child.use_sectional_overwrite()
                 or config_child.use_sectional_overwrite_without_negation()
             ):
-                future_config.add_deep_copy_of(config_child)
+                add_deep_copy_of(config_child)
             # Idempotent commands
-            elif self_child := self.root.driver.idempotent_for(
-                config_child,
-                self.children,
-            ):
-                future_config.add_deep_copy_of(config_child)
+            elif self_child := idempotent_for(config_child, self_children):
+                add_deep_copy_of(config_child)
                 negated_or_recursed.add(self_child.text)
             # config_child is already in self
-            elif self_child := self.get_child(equals=config_child.text):
-                future_child = future_config.add_shallow_copy_of(self_child)
+            elif (self_child := get_self_child(text)) is not None:
+                future_child = add_shallow_copy_of(self_child)
                 self_child._future(config_child, future_child)  # noqa: SLF001
-                negated_or_recursed.add(config_child.text)
+                negated_or_recursed.add(text)
             # config_child is being negated
-            elif config_child.text.startswith(self.driver.negation_prefix):
+            elif text.startswith(negation_prefix):
                 unnegated_command = config_child.text_without_negation
-                if self.get_child(equals=unnegated_command):
+                if unnegated_command in self_children:
                     negated_or_recursed.add(unnegated_command)
                 # Account for "no ..." commands in the running config
                 else:
-                    future_config.add_shallow_copy_of(config_child)
+                    add_shallow_copy_of(config_child)
             # The negated form of config_child is in self.children
-            elif self_child := self.get_child(
-                equals=f"{self.driver.negation_prefix}{config_child.text}",
-            ):
+            elif (self_child := get_self_child(f"{negation_prefix}{text}")) is not None:
                 negated_or_recursed.add(self_child.text)
             # config_child is not in self and doesn't match a special case
             else:
-                future_config.add_deep_copy_of(config_child)
+                add_deep_copy_of(config_child)
 
-        for self_child in self.children:
+        for self_child in self_children:
             # self_child matched an above special case and should be ignored
             if self_child.text in negated_or_recursed:
                 continue
             # self_child was not modified above and should be present in the future config
-            future_config.add_deep_copy_of(self_child)
+            add_deep_copy_of(self_child)
 
     @abstractmethod
     def instantiate_child(self, text: str) -> HConfigChild:
@@ -364,6 +497,9 @@ class HConfigBase(ABC):  # noqa: PLR0904
         target is the destination(i.e. generated_config).
 
         """
+        if self is target:
+            return delta
+
         self._config_to_get_to_left(target, delta)
         self._config_to_get_to_right(target, delta)
 
@@ -371,10 +507,9 @@ class HConfigBase(ABC):  # noqa: PLR0904
 
     @staticmethod
     def _strip_acl_sequence_number(hier_child: HConfigChild) -> str:
-        words = hier_child.text.split()
-        if words[0].isdecimal():
-            words.pop(0)
-        return " ".join(words)
+        text = hier_child.text
+        first_word, _, remainder = text.partition(" ")
+        return remainder if first_word.isdecimal() else text
 
     def _difference(
         self,
@@ -384,11 +519,13 @@ class HConfigBase(ABC):  # noqa: PLR0904
         *,
         in_acl: bool = False,
     ) -> _HConfigRootOrChildT:
-        acl_sw_matches = tuple(f"ip{x} access-list " for x in ("", "v4", "v6"))
+        skip_startswith = (self.driver.negation_prefix, "default ")
+        # delta starts out empty and only gets one copy of each self_child,
+        # so the children added to it need no duplicate checks
 
         for self_child in self.children:
             # Not dealing with negations and defaults for now
-            if self_child.text.startswith((self.driver.negation_prefix, "default ")):
+            if self_child.text.startswith(skip_startswith):
                 continue
 
             if in_acl:
@@ -400,13 +537,15 @@ class HConfigBase(ABC):  # noqa: PLR0904
                     self._strip_acl_sequence_number(self_child),
                 )
             else:
-                target_child = target.get_child(equals=self_child.text)
+                target_child = target.children.get(self_child.text)
 
             if target_child is None:
-                delta.add_deep_copy_of(self_child)
-            else:
-                delta_child = delta.add_child(self_child.text)
-                if self_child.text.startswith(acl_sw_matches):
+                delta.add_deep_copy_of(self_child, check_if_present=False)
+            # A matched leaf has nothing left to compare, so neither the delta
+            # child nor the ACL lookup below are built for it
+            elif self_child.children:
+                delta_child = delta.add_child(self_child.text, check_if_present=False)
+                if self_child.text.startswith(_ACL_STARTSWITH):
                     self_child._difference(  # noqa: SLF001
                         target_child,
                         delta_child,
@@ -453,6 +592,9 @@ class HConfigBase(ABC):  # noqa: PLR0904
         for target_child in target.children:
             # If the child exist, recurse into its children
             if self_child := self.children.get(target_child.text):
+                # Identical subtrees need no remediation, skip comparing them
+                if self_child.children == target_child.children:
+                    continue
                 # Do we need to rewrite the child and its children as well?
                 if self_child.use_sectional_overwrite():
                     self_child.overwrite_with(target_child, delta)
@@ -471,7 +613,7 @@ class HConfigBase(ABC):  # noqa: PLR0904
                 # If the target_child is already in the delta, that means it was negated in the target config
                 if target_child.text in delta.children:
                     continue
-                new_item = delta.add_deep_copy_of(target_child)
+                new_item = delta.add_deep_copy_of(target_child, check_if_present=False)
                 # Mark the new item and all of its children as new_in_config.
                 new_item.new_in_config = True
                 for child in new_item.all_children():
@@ -1,13 +1,13 @@
 from __future__ import annotations
 
 from collections.abc import Iterator
-from itertools import chain
 from logging import Logger, getLogger
-from re import search
+from re import Pattern, search
+from sys import intern
 from typing import TYPE_CHECKING, Any, Optional, Union
 
 from .base import HConfigBase
-from .models import Instance, MatchRule, SetLikeOfStr
+from .models import Instance, MatchRule, ParentAllowsDuplicateChildRule, SetLikeOfStr
 
 if TYPE_CHECKING:
     from collections.abc import Iterable, Iterator
@@ -24,13 +24,20 @@ class HConfigChild(  # noqa: PLR0904  pylint: disable=too-many-instance-attribut
     HConfigBase,
 ):
     __slots__: tuple[str, ...] = (
+        "_depth",
+        "_driver",
+        "_duplicate_child_allowed",
+        "_indentation",
+        "_lineage",
+        "_merged_summaries",
+        "_new_in_config",
+        "_order_weight",
+        "_root",
         "_tags",
         "_text",
         "comments",
         "facts",
         "instances",
-        "new_in_config",
-        "order_weight",
         "parent",
         "real_indent_level",
     )
@@ -45,16 +52,38 @@ class HConfigChild(  # noqa: PLR0904  pylint: disable=too-many-instance-attribut
         """
         super().__init__()
         self.parent: HConfig | HConfigChild = parent
-        self._text: str = text.strip()
+        # Interned so that the same line in two configs is one object,
+        # which makes comparing and looking up texts across configs cheap.
+        self._text: str = intern(text.strip())
         self.real_indent_level: int
         # 0 is the default. Positive weights sink while negative weights rise.
-        self.order_weight: int = 0
+        self._order_weight: int = 0
         self._tags: set[str] = set()
         self.comments: set[str] = set()
-        self.new_in_config: bool = False
+        self._new_in_config: bool = False
         self.instances: list[Instance] = []
         # To store externally inserted facts
         self.facts: dict[Any, Any] = {}
+        # Cached by _is_duplicate_child_allowed() along with the rules it was
+        # checked against, and cleared by _lineage_changed()
+        self._duplicate_child_allowed: Optional[
+            tuple[tuple[ParentAllowsDuplicateChildRule, ...], bool]
+        ] = None
+        # Restamped by _lineage_changed() when self is moved
+        self._depth: int = parent.depth() + 1
+        self._root: HConfig = parent.root
+        self._driver: HConfigDriverBase = self._root.driver
+        # Cached by indentation and cleared by _lineage_changed()
+        self._indentation: Optional[str] = None
+        # Cached by _lineage_tuple() and cleared by _lineage_changed()
+        self._lineage: Optional[tuple[HConfigChild, ...]] = None
+        # Cached by _merged_summary() along with the instances summarized
+        self._merged_summaries: Optional[
+            tuple[
+                tuple[Instance, ...],
+                dict[Optional[str], tuple[int, frozenset[str]]],
+            ]
+        ] = None
 
     def __str__(self) -> str:
         return "\n".join(self.lines(sectional_exiting=True))
@@ -63,30 +92,42 @@ class HConfigChild(  # noqa: PLR0904  pylint: disable=too-many-instance-attribut
         return f"HConfigChild(HConfig{'' if self.parent is self.root else 'Child'}, {self.text})"
 
     def __lt__(self, other: HConfigChild) -> bool:
-        return self.order_weight < other.order_weight
+        return self._order_weight < other._order_weight
 
     def __hash__(self) -> int:
-        return hash(
-            (
-                self.text,
-                # self.tags,
-                # self.comments,
-                self.new_in_config,
-                self.order_weight,
-                *self.children,
-            ),
-        )
+        # The hash changes along with the subtree, so a child must not be
+        # modified while it is a member of a set or a key of a dict.
+        if self._hash is None:
+            self._hash = hash(
+                (
+                    self._text,
+                    # self.tags,
+                    # self.comments,
+                    self._new_in_config,
+                    self._order_weight,
+                    *self.children,
+                ),
+            )
+        return self._hash
 
     def __eq__(self, other: object) -> bool:
         if not isinstance(other, HConfigChild):
             return NotImplemented
 
+        if self is other:
+            return True
+
         # We are intentionally not including the
         # comments, facts, instances, new_in_config, order_weight attributes.
-        if self.text != other.text or self.tags != other.tags:
+        if self._text != other._text:
             return False
 
-        return self.children == other.children
+        if self.children:
+            # Equal children carry equal tags, so the tags of a branch
+            # do not need to be aggregated and compared separately.
+            return self.children == other.children
+
+        return not other.children and self._tags == other._tags
 
     def __ne__(self, other: object) -> bool:
         return not self.__eq__(other=other)
@@ -99,7 +140,7 @@ class HConfigChild(  # noqa: PLR0904  pylint: disable=too-many-instance-attribut
             HConfigDriverBase: The driver of the HConfig object at the base of the tree
 
         """
-        return self.root.driver
+        return self._driver
 
     @property
     def text(self) -> str:
@@ -114,14 +155,48 @@ class HConfigChild(  # noqa: PLR0904  pylint: disable=too-many-instance-attribut
     @text.setter
     def text(self, value: str) -> None:
         """Used for when self.text is changed after the object
-        is instantiated to rebuild the children dictionary.
+        is instantiated to update the children dictionary.
 
         Args:
             value (str): Config text for the HConfigChild.
 
         """
-        self._text = value.strip()
-        self.parent.children.rebuild_mapping()
+        old_text = self._text
+        self._text = intern(value.strip())
+        self.parent.children.rename(self, old_text, self._text)
+        self._lineage_changed()
+        self._hash_changed()
+
+    @property
+    def order_weight(self) -> int:
+        """The weight used to order self amongst its siblings.
+
+        Returns:
+            int: 0 by default. Positive weights sink while negative weights rise.
+
+        """
+        return self._order_weight
+
+    @order_weight.setter
+    def order_weight(self, value: int) -> None:
+        self._order_weight = value
+        self.parent.children.order_changed()
+        self._hash_changed()
+
+    @property
+    def new_in_config(self) -> bool:
+        """Whether self is absent from the running config and new in the target.
+
+        Returns:
+            bool: False by default, set on the lines added by config_to_get_to().
+
+        """
+        return self._new_in_config
+
+    @new_in_config.setter
+    def new_in_config(self, value: bool) -> None:
+        self._new_in_config = value
+        self._hash_changed()
 
     @property
     def text_without_negation(self) -> str:
@@ -141,7 +216,7 @@ class HConfigChild(  # noqa: PLR0904  pylint: disable=too-many-instance-attribut
             HConfig: The HConfig object at the base of the tree.
 
         """
-        return self.parent.root
+        return self._root
 
     def lines(self, *, sectional_exiting: bool = False) -> Iterable[str]:
         """Returns the config lines of the HConfigChild object.
@@ -154,15 +229,14 @@ class HConfigChild(  # noqa: PLR0904  pylint: disable=too-many-instance-attribut
 
         """
         yield self.cisco_style_text()
-        for child in sorted(self.children):
-            yield from child.lines(sectional_exiting=sectional_exiting)
-
+        yield from self._descendant_lines(sectional_exiting=sectional_exiting)
         if sectional_exiting and (exit_text := self.sectional_exit):
-            yield " " * self.driver.rules.indentation * self.depth() + exit_text
+            yield " " * self._driver.rules.indentation * self._depth + exit_text
 
     @property
     def sectional_exit(self) -> Optional[str]:
-        for rule in self.driver.rules.sectional_exiting:
+        driver = self.driver
+        for rule in driver.rules_for_depth(driver.rules.sectional_exiting, self._depth):
             if self.is_lineage_match(rules=rule.match_rules):
                 if exit_text := rule.exit_text:
                     return exit_text
@@ -174,14 +248,40 @@ class HConfigChild(  # noqa: PLR0904  pylint: disable=too-many-instance-attribut
         return "exit"
 
     def delete_sectional_exit(self) -> None:
-        try:
-            potential_exit: HConfigChild = self.children[-1]
-        except IndexError:
+        # Called on every line after loading, so leaves return without raising
+        if not self.children:
             return
 
+        potential_exit = self.children[-1]
         if (exit_text := self.sectional_exit) and exit_text == potential_exit.text:
             potential_exit.delete()
 
+    def _subtree_changed(self) -> None:
+        """Clear cached aggregates here and on every ancestor that still holds them.
+
+        Stopping early is safe because an aggregate is only ever computed
+        after the same aggregate was computed for all descendants.
+        """
+        if (
+            self._descendant_count is not None
+            or self._tags_cache is not None
+            or self._hash is not None
+        ):
+            super()._subtree_changed()
+            self.parent._subtree_changed()  # noqa: SLF001
+
+    def _hash_changed(self) -> None:
+        """Clear the cached hash here and on every ancestor that still holds it."""
+        if self._hash is not None:
+            super()._hash_changed()
+            self.parent._hash_changed()  # noqa: SLF001
+
+    def _tags_changed(self) -> None:
+        """Clear the cached tags here and on every ancestor that still holds them."""
+        if self._tags_cache is not None:
+            super()._tags_changed()
+            self.parent._tags_changed()  # noqa: SLF001
+
     def depth(self) -> int:
         """Returns the distance to the root HConfig object i.e. indent level.
 
@@ -189,7 +289,7 @@ class HConfigChild(  # noqa: PLR0904  pylint: disable=too-many-instance-attribut
             int: Number of indents from the root HConfig object.
 
         """
-        return self.parent.depth() + 1
+        return self._depth
 
     def move(self, new_parent: Union[HConfig, HConfigChild]) -> None:
         """Move one HConfigChild object to different HConfig parent object.
@@ -206,13 +306,24 @@ class HConfigChild(  # noqa: PLR0904  pylint: disable=too-many-instance-attribut
 
         :param new_parent: HConfigChild object -> type list
         """
-        new_parent.children.append(child=self)
         self.delete()
+        self.parent = new_parent
+        new_parent.children.append(child=self)
+        self._lineage_changed()
 
     def lineage(self) -> Iterator[HConfigChild]:
         """Yields the lineage of parent objects up to, but excluding, the root."""
-        yield from self.parent.lineage()
-        yield self
+        return iter(self._lineage_tuple())
+
+    def _lineage_tuple(self) -> tuple[HConfigChild, ...]:
+        """The lineage of self, built once from the lineage of the parent."""
+        if self._lineage is None:
+            parent = self.parent
+            if isinstance(parent, HConfigChild):
+                self._lineage = (*parent._lineage_tuple(), self)  # noqa: SLF001
+            else:
+                self._lineage = (self,)
+        return self._lineage
 
     def path(self) -> Iterator[str]:
         """Yields the text attribute of child objects up to, but excluding, the root."""
@@ -238,13 +349,7 @@ class HConfigChild(  # noqa: PLR0904  pylint: disable=too-many-instance-attribut
         if style == "without_comments":
             pass
         elif style == "merged":
-            # count the number of instances that have the tag
-            instance_count: int = 0
-            instance_comments: set[str] = set()
-            for instance in self.instances:
-                if tag is None or tag in instance.tags:
-                    instance_count += 1
-                    instance_comments.update(instance.comments)
+            instance_count, instance_comments = self._merged_summary(tag)
 
             # should the word 'instance' be plural?
             word: str = "instance" if instance_count == 1 else "instances"
@@ -257,9 +362,34 @@ class HConfigChild(  # noqa: PLR0904  pylint: disable=too-many-instance-attribut
         comments_str: str = f" !{', '.join(sorted(comments))}" if comments else ""
         return f"{self.indentation}{self.text}{comments_str}"
 
+    def _merged_summary(self, tag: Optional[str]) -> tuple[int, frozenset[str]]:
+        """Count the instances that have the tag and collect their comments.
+
+        The summary of each tag is cached until self.instances no longer holds
+        the same instances. Instance is frozen, and comparing the tuples checks
+        identity before equality for each instance.
+        """
+        instances = tuple(self.instances)
+        if self._merged_summaries is None or self._merged_summaries[0] != instances:
+            self._merged_summaries = (instances, {})
+        summaries = self._merged_summaries[1]
+
+        if (summary := summaries.get(tag)) is None:
+            instance_count: int = 0
+            instance_comments: set[str] = set()
+            for instance in instances:
+                if tag is None or tag in instance.tags:
+                    instance_count += 1
+                    instance_comments.update(instance.comments)
+            summary = summaries[tag] = (instance_count, frozenset(instance_comments))
+
+        return summary
+
     @property
     def indentation(self) -> str:
-        return " " * self.driver.rules.indentation * (self.depth() - 1)
+        if self._indentation is None:
+            self._indentation = " " * self._driver.rules.indentation * (self._depth - 1)
+        return self._indentation
 
     def delete(self) -> None:
         """Delete the current object from its parent."""
@@ -267,23 +397,27 @@ class HConfigChild(  # noqa: PLR0904  pylint: disable=too-many-instance-attribut
 
     def tags_add(self, tag: Union[str, Iterable[str]]) -> None:
         """Add a tag to self._tags on all leaf nodes."""
-        if self.is_branch:
+        if self.children:
             for child in self.children:
                 child.tags_add(tag=tag)
-        elif isinstance(tag, str):
-            self._tags.add(tag)
         else:
-            self._tags.update(tag)
+            if isinstance(tag, str):
+                self._tags.add(tag)
+            else:
+                self._tags.update(tag)
+            self._tags_changed()
 
     def tags_remove(self, tag: Union[str, Iterable[str]]) -> None:
         """Remove a tag from self._tags on all leaf nodes."""
-        if self.is_branch:
+        if self.children:
             for child in self.children:
                 child.tags_remove(tag=tag)
-        elif isinstance(tag, str):
-            self._tags.remove(tag)
         else:
-            self._tags.difference_update(tag)
+            if isinstance(tag, str):
+                self._tags.remove(tag)
+            else:
+                self._tags.difference_update(tag)
+            self._tags_changed()
 
     def negate(self) -> HConfigChild:
         """Negate self.text."""
@@ -297,9 +431,12 @@ class HConfigChild(  # noqa: PLR0904  pylint: disable=too-many-instance-attribut
         return self.driver.swap_negation(child=self)
 
     def use_default_for_negation(self, config: HConfigChild) -> bool:
+        driver = self.driver
         return any(
             config.is_lineage_match(rules=rule.match_rules)
-            for rule in self.driver.rules.negation_default_when
+            for rule in driver.rules_for_depth(
+                driver.rules.negation_default_when, config.depth()
+            )
         )
 
     @property
@@ -315,33 +452,40 @@ class HConfigChild(  # noqa: PLR0904  pylint: disable=too-many-instance-attribut
     @property
     def tags(self) -> frozenset[str]:
         """Recursive access to tags on all leaf nodes."""
-        if self.is_branch:
-            found_tags: set[str] = set()
-            for child in self.children:
-                found_tags.update(child.tags)
-            return frozenset(found_tags)
+        if self._tags_cache is None:
+            if self.children:
+                found_tags: set[str] = set()
+                for child in self.children:
+                    found_tags.update(child.tags)
+                self._tags_cache = frozenset(found_tags)
+            else:
+                self._tags_cache = frozenset(self._tags)
 
-        return frozenset(self._tags)
+        return self._tags_cache
 
     @tags.setter
     def tags(self, value: frozenset[str]) -> None:
         """Recursive access to tags on all leaf nodes."""
-        if self.is_branch:
+        if self.children:
             for child in self.children:
                 child.tags = value
         else:
             self._tags = set(value)
+            self._tags_changed()
 
     def is_idempotent_command(self, other_children: Iterable[HConfigChild]) -> bool:
         """Determine if self.text is an idempotent change."""
         # Avoid list commands from matching as idempotent
-        for rule in self.driver.rules.idempotent_commands_avoid:
+        driver = self.driver
+        for rule in driver.rules_for_depth(
+            driver.rules.idempotent_commands_avoid, self._depth
+        ):
             if self.is_lineage_match(rules=rule.match_rules):
                 return False
 
         # Idempotent command identification
         return bool(
-            self.driver.idempotent_for(
+            driver.idempotent_for(
                 config=self,
                 other_children=other_children,
             )
@@ -351,16 +495,22 @@ class HConfigChild(  # noqa: PLR0904  pylint: disable=too-many-instance-attribut
         """Check self's text to see if negation should be handled by
         overwriting the section without first negating it.
         """
+        driver = self.driver
         return any(
             self.is_lineage_match(rules=rule.match_rules)
-            for rule in self.driver.rules.sectional_overwrite_no_negate
+            for rule in driver.rules_for_depth(
+                driver.rules.sectional_overwrite_no_negate, self._depth
+            )
         )
 
     def use_sectional_overwrite(self) -> bool:
         """Determines if self.text matches a sectional overwrite rule."""
+        driver = self.driver
         return any(
             self.is_lineage_match(rules=rule.match_rules)
-            for rule in self.driver.rules.sectional_overwrite
+            for rule in driver.rules_for_depth(
+                driver.rules.sectional_overwrite, self._depth
+            )
         )
 
     def overwrite_with(
@@ -397,19 +547,20 @@ class HConfigChild(  # noqa: PLR0904  pylint: disable=too-many-instance-attribut
         """Given the line_tags, include_tags, and exclude_tags,
         determine if the line should be included.
         """
+        tags = self.tags
         include_line = False
 
         if include_tags:
-            include_line = bool(self.tags.intersection(include_tags))
+            include_line = not tags.isdisjoint(include_tags)
         if exclude_tags and (include_line or not include_tags):
-            return not bool(self.tags.intersection(exclude_tags))
+            return tags.isdisjoint(exclude_tags)
 
         return include_line
 
     @property
     def instance(self) -> Instance:
         return Instance(
-            id=id(self.root),
+            id=self.root.instance_id,
             comments=frozenset(self.comments),
             tags=frozenset(self.tags),
         )
@@ -420,29 +571,53 @@ class HConfigChild(  # noqa: PLR0904  pylint: disable=too-many-instance-attribut
         exclude_tags: Iterable[str],
     ) -> Iterator[HConfigChild]:
         """Yield all children recursively that match include/exclude tags."""
-        if self.is_leaf:
+        if not self.children:
             if self.line_inclusion_test(
                 include_tags=include_tags,
                 exclude_tags=exclude_tags,
             ):
                 yield self
-        else:
-            self_iter: Iterator[HConfigChild] = iter((self,))
-            for child in sorted(self.children):
-                included_children: Iterator[HConfigChild] = (
-                    child.all_children_sorted_by_tags(
-                        include_tags=include_tags,
-                        exclude_tags=exclude_tags,
-                    )
-                )
-                if peek := next(included_children, None):
-                    yield from chain(self_iter, (peek,), included_children)
+            return
+
+        # The tags of a branch are those of all of its leaves, so a branch
+        # without any of include_tags has no leaf to yield
+        if include_tags and self.tags.isdisjoint(include_tags):
+            return
+
+        # A branch is only yielded ahead of its first included leaf.
+        # stack[:yielded] holds the branches that have been yielded already.
+        stack: list[tuple[HConfigChild, Iterator[HConfigChild]]] = [
+            (self, iter(self.children.sorted_data())),
+        ]
+        yielded = 0
+        while stack:
+            for child in stack[-1][1]:
+                if child.children:
+                    if include_tags and child.tags.isdisjoint(include_tags):
+                        continue
+                    stack.append((child, iter(child.children.sorted_data())))
+                    break
+                if child.line_inclusion_test(
+                    include_tags=include_tags,
+                    exclude_tags=exclude_tags,
+                ):
+                    for branch, _ in stack[yielded:]:
+                        yield branch
+                    yielded = len(stack)
+                    yield child
+            else:
+                stack.pop()
+                yielded = min(yielded, len(stack))
 
     def is_lineage_match(self, rules: tuple[MatchRule, ...]) -> bool:
         """A generic test against a lineage of HConfigChild objects."""
-        lineage: tuple[HConfigBase, ...] = tuple(self.lineage())
+        # The lineage is as long as self is deep
+        if len(rules) != self._depth:
+            return False
+
+        lineage = self._lineage_tuple()
 
-        return len(rules) == len(lineage) and all(
+        return all(
             child.is_match(
                 equals=rule.equals,
                 startswith=rule.startswith,
@@ -461,51 +636,43 @@ class HConfigChild(  # noqa: PLR0904  pylint: disable=too-many-instance-attribut
         startswith: Union[str, tuple[str, ...], None] = None,
         endswith: Union[str, tuple[str, ...], None] = None,
         contains: Union[str, tuple[str, ...], None] = None,
-        re_search: Optional[str] = None,
+        re_search: Union[str, Pattern[str], None] = None,
     ) -> bool:
         """True if `self.text` matches all the criteria.
 
         If all args are None, the function will return True.
         If multiple args are provided, then all will need to match in order to return True.
         """
+        text = self._text
+        # The filters run from the cheapest to the most expensive
         # Equals filter
-        if isinstance(equals, str):
-            if self.text != equals:
-                return False
-        elif (  # pylint: disable=confusing-consecutive-elif
-            isinstance(equals, frozenset) and self.text not in equals
+        if equals is not None and (
+            text != equals if isinstance(equals, str) else text not in equals
         ):
             return False
 
         # Startswith filter
-        if isinstance(startswith, (str, tuple)) and not self.text.startswith(
-            startswith
-        ):
+        if startswith is not None and not text.startswith(startswith):
             return False
 
-        # Regex filter
-        if isinstance(re_search, str) and not search(
-            pattern=re_search,
-            string=self.text,
-        ):
-            return False
-
-        # The below filters are less commonly used
         # Endswith filter
-        if isinstance(endswith, (str, tuple)) and not self.text.endswith(endswith):
+        if endswith is not None and not text.endswith(endswith):
             return False
 
         # Contains filter
-        if isinstance(contains, str):
-            if contains not in self.text:
-                return False
-        elif isinstance(  # pylint: disable=confusing-consecutive-elif
-            contains,
-            tuple,
-        ) and not any(c in self.text for c in contains):
+        if contains is not None and (
+            contains not in text
+            if isinstance(contains, str)
+            else not any(c in text for c in contains)
+        ):
             return False
 
-        return True
+        # Regex filter
+        if re_search is None:
+            return True
+        if isinstance(re_search, str):
+            return search(pattern=re_search, string=text) is not None
+        return re_search.search(text) is not None
 
     def add_children_deep(self, lines: Iterable[str]) -> HConfigChild:
         """Add child instances of HConfigChild deeply."""
@@ -523,8 +690,37 @@ class HConfigChild(  # noqa: PLR0904  pylint: disable=too-many-instance-attribut
         return HConfigChild(parent=self, text=text)
 
     def _is_duplicate_child_allowed(self) -> bool:
-        """Determine if duplicate(identical text) children are allowed under the parent."""
-        return any(
-            self.is_lineage_match(rules=rule.match_rules)
-            for rule in self.driver.rules.parent_allows_duplicate_child
+        """Determine if duplicate(identical text) children are allowed under the parent.
+
+        The result is cached as it only depends on the lineage texts and the
+        driver rules. rules_for_depth() returns new groups whenever the rule
+        list changes, so the cache is only reused with the same rules.
+        """
+        driver = self._driver
+        rules = driver.rules_for_depth(
+            driver.rules.parent_allows_duplicate_child, self._depth
         )
+        cached = self._duplicate_child_allowed
+        if cached is None or cached[0] is not rules:
+            cached = self._duplicate_child_allowed = (
+                rules,
+                any(self.is_lineage_match(rules=rule.match_rules) for rule in rules),
+            )
+        return cached[1]
+
+    def _lineage_changed(self) -> None:
+        """Clear the lineage based caches of self and all descendants."""
+        self._duplicate_child_allowed = None
+        self._depth = self.parent.depth() + 1
+        self._indentation = None
+        self._lineage = None
+        self._root = root = self.parent.root
+        self._driver = driver = root.driver
+        # all_children() yields parents before their children
+        for child in self.all_children():
+            child._duplicate_child_allowed = None  # noqa: SLF001
+            child._lineage = None  # noqa: SLF001
+            child._depth = child.parent.depth() + 1  # noqa: SLF001
+            child._indentation = None  # noqa: SLF001
+            child._root = root  # noqa: SLF001
+            child._driver = driver  # noqa: SLF001
@@ -1,20 +1,40 @@
 from __future__ import annotations
 
+from operator import attrgetter
 from typing import TYPE_CHECKING, Optional, TypeVar, Union, overload
 
 if TYPE_CHECKING:
-    from collections.abc import Iterable, Iterator
+    from collections.abc import Iterable, Iterator, Sequence
 
     from hier_config import HConfigChild
 
+    from .base import HConfigBase
+
 _D = TypeVar("_D")
 
+# Reads the slot behind HConfigChild.order_weight in C, unlike HConfigChild.__lt__
+_ORDER_WEIGHT_KEY = attrgetter("_order_weight")
+
 
 class HConfigChildren:
-    def __init__(self) -> None:
-        """Initialize the HConfigChildren class."""
+    __slots__ = ("_data", "_mapping", "_owner", "_positions", "_sorted", "_texts")
+
+    def __init__(self, owner: HConfigBase) -> None:
+        """Initialize the HConfigChildren class.
+
+        Args:
+            owner (HConfigBase): The HConfig or HConfigChild these children belong to.
+
+        """
+        self._owner = owner
         self._data: list[HConfigChild] = []
         self._mapping: dict[str, HConfigChild] = {}
+        # The index in self._data of each child in self._mapping
+        self._positions: dict[str, int] = {}
+        # The text of each child in self._data, kept in step with it
+        self._texts: list[str] = []
+        # Cached by sorted_data() and cleared by _changed()
+        self._sorted: Optional[tuple[HConfigChild, ...]] = None
 
     @overload
     def __getitem__(self, subscript: Union[int, str]) -> HConfigChild: ...
@@ -34,6 +54,7 @@ class HConfigChildren:
     def __setitem__(self, index: int, child: HConfigChild) -> None:
         self._data[index] = child
         self.rebuild_mapping()
+        self._changed()
 
     def __contains__(self, item: str) -> bool:
         return item in self._mapping
@@ -44,14 +65,17 @@ class HConfigChildren:
     def __len__(self) -> int:
         return len(self._data)
 
+    def __bool__(self) -> bool:
+        return bool(self._data)
+
     def __eq__(self, other: object) -> bool:
         if not isinstance(other, HConfigChildren):
             return NotImplemented
 
         self_len = len(self._data)
         other_len = len(other._data)
-        # Superfast succeed method for no children
-        if self_len == other_len == 0:
+        # Superfast succeed method for the same children or no children
+        if self is other or self_len == other_len == 0:
             return True
 
         # Superfast fail method
@@ -62,12 +86,22 @@ class HConfigChildren:
         if self._mapping.keys() != other._mapping.keys():
             return False
 
+        # Fast fail method for subtrees whose sizes were already counted
+        self_count = self._owner._descendant_count
+        other_count = other._owner._descendant_count
+        if (
+            self_count is not None
+            and other_count is not None
+            and self_count != other_count
+        ):
+            return False
+
         # Slower full comparison
         return all(
             self_child == other_child
             for self_child, other_child in zip(
-                sorted(self._data),
-                sorted(other._data),
+                self.sorted_data(),
+                other.sorted_data(),
             )
         )
 
@@ -93,16 +127,23 @@ class HConfigChildren:
             HConfigChild: The child that was added.
 
         """
+        text = child.text
         self._data.append(child)
-        if update_mapping:
-            self._mapping.setdefault(child.text, child)
+        self._texts.append(text)
+        if update_mapping and text not in self._mapping:
+            self._mapping[text] = child
+            self._positions[text] = len(self._data) - 1
+        self._changed()
 
         return child
 
     def clear(self) -> None:
         """Delete all children."""
         self._data.clear()
+        self._texts.clear()
         self._mapping.clear()
+        self._positions.clear()
+        self._changed()
 
     def delete(self, child_or_text: Union[HConfigChild, str]) -> None:
         """Delete a child from self._data and self._mapping.
@@ -112,14 +153,93 @@ class HConfigChildren:
 
         """
         if isinstance(child_or_text, str):
-            if child_or_text in self._mapping:
-                self._data[:] = [c for c in self._data if c.text != child_or_text]
-                self.rebuild_mapping()
+            if child_or_text not in self._mapping:
+                return
+            # Unless duplicated, the mapped child is the only one with this text
+            if self._is_duplicated(child_or_text):
+                self._delete_text(child_or_text)
+            else:
+                self._delete_mapped_child(self._mapping[child_or_text])
+            self._changed()
+        elif self._mapping.get(child_or_text.text) is child_or_text:
+            self._delete_mapped_child(child_or_text)
+            self._changed()
         else:
-            old_len: int = len(self._data)
-            self._data = [c for c in self._data if c is not child_or_text]
-            if old_len != len(self._data):
-                self.rebuild_mapping()
+            # Unmapped children are duplicates, which tend to be near the end
+            for index in range(len(self._data) - 1, -1, -1):
+                if self._data[index] is child_or_text:
+                    self._delete_index(index)
+                    self._changed()
+                    break
+
+    def _changed(self) -> None:
+        """Clear the cached order and notify the owner after a structural change."""
+        self._sorted = None
+        self._owner._subtree_changed()  # noqa: SLF001
+
+    def order_changed(self) -> None:
+        """Clear the cached order after a child's order_weight changed."""
+        self._sorted = None
+
+    def _delete_index(self, index: int) -> None:
+        """Delete the child at index from self._data and shift self._positions."""
+        # New lists rather than deleting in place, so that loops already
+        # iterating over the children still see every one of them
+        self._data = self._data[:index] + self._data[index + 1 :]
+        self._texts = self._texts[:index] + self._texts[index + 1 :]
+
+        # Children after the deleted one have moved up by one
+        if index != len(self._data):
+            for text, position in self._positions.items():
+                if position > index:
+                    self._positions[text] = position - 1
+
+    def _is_duplicated(self, text: str) -> bool:
+        """Determine if more than one child has text, which must be in self._mapping."""
+        if len(self._mapping) == len(self._data):
+            return False
+        try:
+            self._texts.index(text, self._positions[text] + 1)
+        except ValueError:
+            return False
+        return True
+
+    def _delete_text(self, text: str) -> None:
+        """Delete every child with text in one pass, keeping the other mappings."""
+        mapping = self._mapping
+        positions = self._positions
+        del mapping[text]
+        del positions[text]
+
+        data: list[HConfigChild] = []
+        texts: list[str] = []
+        for child, child_text in zip(self._data, self._texts):
+            if child_text == text:
+                continue
+            if mapping.get(child_text) is child:
+                positions[child_text] = len(data)
+            data.append(child)
+            texts.append(child_text)
+        # Replaced rather than updated in place, like in _delete_index()
+        self._data = data
+        self._texts = texts
+
+    def _delete_mapped_child(self, child: HConfigChild) -> None:
+        """Delete a child that is in self._mapping by its known position."""
+        text = child.text
+        has_duplicates = len(self._mapping) != len(self._data)
+        index = self._positions.pop(text)
+        del self._mapping[text]
+        self._delete_index(index)
+
+        # Another child with the same text may now be the first one
+        if has_duplicates:
+            try:
+                position = self._texts.index(text, index)
+            except ValueError:
+                return
+            self._mapping[text] = self._data[position]
+            self._positions[text] = position
 
     def extend(self, children: Iterable[HConfigChild]) -> None:
         """Add child instances of HConfigChild and update _mapping.
@@ -128,9 +248,21 @@ class HConfigChildren:
             children (Iterable[HConfigChild]): The children to add.
 
         """
-        self._data.extend(children)
-        for child in children:
-            self._mapping.setdefault(child.text, child)
+        # children may be an iterator, so it can only be consumed once
+        new_children = list(children)
+        new_texts = [child.text for child in new_children]
+        mapping = self._mapping
+        positions = self._positions
+        for index, (child, text) in enumerate(
+            zip(new_children, new_texts), start=len(self._data)
+        ):
+            # The first child with a given text wins
+            if text not in mapping:
+                mapping[text] = child
+                positions[text] = index
+        self._data.extend(new_children)
+        self._texts.extend(new_texts)
+        self._changed()
 
     def get(
         self, key: str, default: Optional[_D] = None
@@ -151,6 +283,8 @@ class HConfigChildren:
     def index(self, child: HConfigChild) -> int:
         """Get the index of a child in self._data.
 
+        Children present in self._mapping are looked up in constant time.
+
         Args:
             child (HConfigChild): The child to get the index of.
 
@@ -158,10 +292,92 @@ class HConfigChildren:
             int: The index of the child.
 
         """
+        if self._mapping.get(child.text) is child:
+            return self._positions[child.text]
         return self._data.index(child)
 
     def rebuild_mapping(self) -> None:
-        """Rebuild self._mapping from self._data."""
-        self._mapping.clear()
-        for child in self._data:
-            self._mapping.setdefault(child.text, child)
+        """Rebuild self._mapping, self._positions, and self._texts from self._data."""
+        mapping: dict[str, HConfigChild] = {}
+        positions: dict[str, int] = {}
+        texts: list[str] = []
+        for index, child in enumerate(self._data):
+            text = child.text
+            texts.append(text)
+            # The first child with a given text wins
+            if text not in mapping:
+                mapping[text] = child
+                positions[text] = index
+        self._mapping = mapping
+        self._positions = positions
+        self._texts = texts
+
+    def rename(self, child: HConfigChild, old_text: str, new_text: str) -> None:
+        """Update self._mapping, self._positions, and self._texts for a renamed child.
+
+        This patches the entries of the two texts instead of rebuilding everything.
+        A child that isn't in self._data is ignored.
+
+        Args:
+            child (HConfigChild): The child whose text changed.
+            old_text (str): The text of the child before the change.
+            new_text (str): The text of the child after the change.
+
+        """
+        if old_text == new_text:
+            return
+
+        mapping = self._mapping
+        positions = self._positions
+        if mapping.get(old_text) is child:
+            has_duplicates = len(mapping) != len(self._data)
+            index = positions.pop(old_text)
+            del mapping[old_text]
+            # Another child with the old text may now be the first one
+            if has_duplicates:
+                try:
+                    position = self._texts.index(old_text, index + 1)
+                except ValueError:
+                    pass
+                else:
+                    mapping[old_text] = self._data[position]
+                    positions[old_text] = position
+        else:
+            for index in range(len(self._data) - 1, -1, -1):
+                if self._data[index] is child:
+                    break
+            else:
+                return
+
+        self._texts[index] = new_text
+        # The first child with a given text wins
+        first_position = positions.get(new_text)
+        if first_position is None or first_position > index:
+            mapping[new_text] = child
+            positions[new_text] = index
+
+    def sorted_data(self) -> tuple[HConfigChild, ...]:
+        """Get the children sorted by order_weight.
+
+        The result is cached until a child is added, removed, or has its
+        order_weight changed.
+
+        Returns:
+            tuple[HConfigChild, ...]: The children, sorted by order_weight.
+
+        """
+        if self._sorted is None:
+            self._sorted = tuple(sorted(self._data, key=_ORDER_WEIGHT_KEY))
+        return self._sorted
+
+    def texts(self) -> Sequence[str]:
+        """Get the text of every child in self._data, in order.
+
+        The texts are stored alongside the children, which lets text scans
+        avoid a property lookup per child. The result must not be modified.
+
+        Returns:
+            Sequence[str]: The text of each child.
+
+        """
+        return self._texts
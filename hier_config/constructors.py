@@ -140,6 +140,17 @@ def get_hconfig_fast_load(
     if isinstance(lines, str):
         lines = lines.splitlines()
 
+    # Unindented lines are all top level children with no sections to exit,
+    # so unless one is a duplicate they can be added in a single batch
+    if not any(line[:1].isspace() for line in lines):
+        texts = [text for line in lines if (text := " ".join(line.split()))]
+        if len(set(texts)) == len(texts):
+            children = [config.instantiate_child(text) for text in texts]
+            for child in children:
+                child.real_indent_level = 0
+            config.children.extend(children)
+            return config
+
     current_section: Union[HConfig, HConfigChild] = config
     most_recent_item: Union[HConfig, HConfigChild] = current_section
 
@@ -1,6 +1,6 @@
 from abc import ABC, abstractmethod
 from collections.abc import Callable, Iterable
-from typing import Optional
+from typing import Any, Optional, Protocol, TypeVar
 
 from pydantic import Field, PositiveInt
 
@@ -11,6 +11,7 @@ from hier_config.models import (
     IdempotentCommandsAvoidRule,
     IdempotentCommandsRule,
     IndentAdjustRule,
+    MatchRule,
     NegationDefaultWhenRule,
     NegationDefaultWithRule,
     OrderingRule,
@@ -23,6 +24,14 @@ from hier_config.models import (
 from hier_config.root import HConfig
 
 
+class _LineageRule(Protocol):  # pylint: disable=too-few-public-methods
+    @property
+    def match_rules(self) -> tuple[MatchRule, ...]: ...
+
+
+_LineageRuleT = TypeVar("_LineageRuleT", bound=_LineageRule)
+
+
 class HConfigDriverRules(BaseModel):  # pylint: disable=too-many-instance-attributes
     """Configuration rules used by a driver to control parsing, matching,
     ordering, rendering, and normalization of device configurations.
@@ -75,6 +84,44 @@ class HConfigDriverBase(ABC):
     def __init__(self) -> None:
         """Initialize the HConfigDriverBase class."""
         self.rules: HConfigDriverRules = self._instantiate_rules()
+        # Groups made by rules_for_depth(), keyed by id() of the rule list and
+        # stored with a copy of the rules they were made from
+        self._rules_by_depth: dict[
+            int, tuple[list[Any], dict[int, tuple[Any, ...]]]
+        ] = {}
+
+    def rules_for_depth(
+        self,
+        rules: list[_LineageRuleT],
+        depth: int,
+    ) -> tuple[_LineageRuleT, ...]:
+        """Get the rules that can match a lineage of `depth` children.
+
+        A lineage only matches rules with as many match_rules as it is long,
+        so the rules are grouped by that length. The groups are rebuilt
+        whenever the list no longer equals the copy they were made from,
+        which catches rules being added, removed, replaced, or reordered.
+
+        Args:
+            rules (list[_LineageRuleT]): A rule list of self.rules.
+            depth (int): The depth of the child to be matched.
+
+        Returns:
+            tuple[_LineageRuleT, ...]: The rules for depth, in their original order.
+
+        """
+        grouped = self._rules_by_depth.get(id(rules))
+        # Comparing the lists checks identity before equality for each rule
+        if grouped is None or grouped[0] != rules:
+            by_depth: dict[int, list[_LineageRuleT]] = {}
+            for rule in rules:
+                by_depth.setdefault(len(rule.match_rules), []).append(rule)
+            grouped = (
+                list(rules),
+                {length: tuple(group) for length, group in by_depth.items()},
+            )
+            self._rules_by_depth[id(rules)] = grouped
+        return grouped[1].get(depth, ())
 
     def idempotent_for(
         self,
@@ -91,7 +138,9 @@ class HConfigDriverBase(ABC):
             Optional[HConfigChild]: HConfigChild that matches `config` or None.
 
         """
-        for rule in self.rules.idempotent_commands:
+        for rule in self.rules_for_depth(
+            self.rules.idempotent_commands, config.depth()
+        ):
             if config.is_lineage_match(rules=rule.match_rules):
                 for other_child in other_children:
                     if other_child.is_lineage_match(rules=rule.match_rules):
@@ -117,7 +166,7 @@ class HConfigDriverBase(ABC):
             Optional[str]: String to use for negation or None.
 
         """
-        for with_rule in self.rules.negate_with:
+        for with_rule in self.rules_for_depth(self.rules.negate_with, config.depth()):
             if config.is_lineage_match(rules=with_rule.match_rules):
                 return with_rule.use
         return None
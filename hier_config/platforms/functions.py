@@ -1,3 +1,8 @@
+from re import compile as re_compile
+
+_NUMBER_RANGE = re_compile(r"(\d+)(?:-(\d+))?")
+
+
 def expand_range(number_range_str: str) -> tuple[int, ...]:
     """Expand ranges like 2-5,8,22-45.
 
@@ -15,20 +20,20 @@ def expand_range(number_range_str: str) -> tuple[int, ...]:
 
     """
     numbers: list[int] = []
+    seen: set[int] = set()
     for number_range in number_range_str.split(sep=","):
-        start_stop: list[str] = number_range.split(sep="-")
-        if len(start_stop) == 2:
-            start = int(start_stop[0])
-            stop = int(start_stop[1])
-            numbers.extend(n for n in range(start, stop + 1))
-        if len(start_stop) == 1:
-            numbers.append(int(start_stop[0]))
-        else:
+        match = _NUMBER_RANGE.fullmatch(number_range.strip())
+        if match is None:
             message: str = f"Invalid range: {number_range}"
             raise ValueError(message)
-    if len(set(numbers)) != len(numbers):
-        message: str = "len(set(numbers)) must be equal to len(numbers)."
-        raise ValueError(message)
+        start, stop = match.groups()
+        span = range(int(start), int(stop or start) + 1)
+        numbers.extend(span)
+        seen.update(span)
+        # Fail on the first duplicate rather than after expanding everything
+        if len(seen) != len(numbers):
+            message = "len(set(numbers)) must be equal to len(numbers)."
+            raise ValueError(message)
     return tuple(numbers)
 
 
@@ -50,7 +55,8 @@ def convert_to_set_commands(config_raw: str) -> str:
     set_commands: list[str] = []
 
     for line in lines:
-        stripped_line: str = line.strip()
+        unindented_line: str = line.lstrip()
+        stripped_line: str = unindented_line.rstrip()
 
         # Skip empty lines
         if not stripped_line:
@@ -58,13 +64,13 @@ def convert_to_set_commands(config_raw: str) -> str:
 
         # Strip ; from the end of the line
         if stripped_line.endswith(";"):
-            stripped_line: str = stripped_line.replace(";", "")
+            stripped_line = stripped_line[:-1].rstrip()
 
         # Count the number of spaces at the beginning to determine the level
-        level: int = line.find(stripped_line) // 4
+        level: int = (len(line) - len(unindented_line)) // 4
 
         # Adjust the current path based on the level
-        path = path[:level]
+        del path[level:]
 
         # If the line ends with '{' or '}', it starts a new block
         if stripped_line.endswith(("{", "}")):
@@ -1,10 +1,12 @@
 from __future__ import annotations
 
+from itertools import count
 from logging import getLogger
 from typing import TYPE_CHECKING, Optional, Union
 
 from .base import HConfigBase
 from .child import HConfigChild
+from .exceptions import DuplicateChildError
 from .models import Dump, DumpLine
 
 if TYPE_CHECKING:
@@ -14,8 +16,8 @@ if TYPE_CHECKING:
 
 logger = getLogger(__name__)
 
-# Refactoring ideas:
-# - Cases of children.index() could be replaced with an identity based approach.
+# Unlike id(), these are never reused by a later HConfig object
+_instance_ids = count(1)
 
 
 class HConfig(HConfigBase):  # noqa: PLR0904
@@ -23,31 +25,49 @@ class HConfig(HConfigBase):  # noqa: PLR0904
     hierarchical tree data structure.
     """
 
-    __slots__ = ("_driver",)
+    __slots__ = ("_driver", "_instance_id")
 
     def __init__(self, driver: HConfigDriverBase) -> None:
         super().__init__()
         self._driver = driver
+        self._instance_id: int = next(_instance_ids)
 
     def __str__(self) -> str:
-        return "\n".join(str(c) for c in sorted(self.children))
+        # The same as joining str() of each child, in a single traversal
+        return "\n".join(self.lines(sectional_exiting=True))
 
     def __repr__(self) -> str:
         return f"HConfig(driver={self.driver.__class__.__name__}, lines={self.dump_simple()})"
 
     def __hash__(self) -> int:
-        return hash(*self.children)
+        # Like HConfigChild, the hash changes along with the config.
+        if self._hash is None:
+            self._hash = hash(tuple(self.children))
+        return self._hash
 
     def __eq__(self, other: object) -> bool:
         if not isinstance(other, HConfig):
             return NotImplemented
 
+        if self is other:
+            return True
+
         return self.children == other.children
 
     @property
     def driver(self) -> HConfigDriverBase:
         return self._driver
 
+    @property
+    def instance_id(self) -> int:
+        """The id of this config in the Instance objects of its children.
+
+        Returns:
+            int: A positive integer unique to this HConfig object.
+
+        """
+        return self._instance_id
+
     @property
     def real_indent_level(self) -> int:
         return -1
@@ -77,10 +97,12 @@ class HConfig(HConfigBase):  # noqa: PLR0904
     @property
     def tags(self) -> frozenset[str]:
         """Recursive access to tags on all leaf nodes."""
-        found_tags: set[str] = set()
-        for child in self.children:
-            found_tags.update(child.tags)
-        return frozenset(found_tags)
+        if self._tags_cache is None:
+            found_tags: set[str] = set()
+            for child in self.children:
+                found_tags.update(child.tags)
+            self._tags_cache = frozenset(found_tags)
+        return self._tags_cache
 
     @tags.setter
     def tags(self, value: frozenset[str]) -> None:
@@ -91,10 +113,21 @@ class HConfig(HConfigBase):  # noqa: PLR0904
     def merge(self, other: Union[HConfig, Iterable[HConfig]]) -> HConfig:
         """Merges other HConfig objects into this one."""
         other_configs = (other,) if isinstance(other, HConfig) else other
-
-        for other_config in other_configs:
-            for child in other_config.children:
-                self.add_deep_copy_of(child, merged=True)
+        children_to_add = [
+            child for other_config in other_configs for child in other_config.children
+        ]
+
+        # A root never allows duplicate children, so every text is checked up
+        # front and the copies are then added without further checks
+        self_children = self.children
+        texts_to_add: set[str] = set()
+        for child in children_to_add:
+            text = child.text
+            if text in texts_to_add or text in self_children:
+                message = f"Found a duplicate section: {(text,)}"
+                raise DuplicateChildError(message)
+            texts_to_add.add(text)
+        self._add_deep_copies_of(children_to_add, merged=True)
 
         return self
 
@@ -113,8 +146,8 @@ class HConfig(HConfigBase):  # noqa: PLR0904
         yield from ()
 
     def lines(self, *, sectional_exiting: bool = False) -> Iterable[str]:
-        for child in sorted(self.children):
-            yield from child.lines(sectional_exiting=sectional_exiting)
+        # A single traversal rather than a generator per top level child
+        yield from self._descendant_lines(sectional_exiting=sectional_exiting)
 
     def dump_simple(self, *, sectional_exiting: bool = False) -> tuple[str, ...]:
         return tuple(self.lines(sectional_exiting=sectional_exiting))
@@ -126,7 +159,8 @@ class HConfig(HConfigBase):  # noqa: PLR0904
                 DumpLine(
                     depth=c.depth(),
                     text=c.text,
-                    tags=frozenset(c.tags),
+                    # Already a frozenset, for branches as well as leaves
+                    tags=c.tags,
                     comments=frozenset(c.comments),
                     new_in_config=c.new_in_config,
                 )
@@ -171,10 +205,14 @@ class HConfig(HConfigBase):  # noqa: PLR0904
 
     def set_order_weight(self) -> HConfig:
         """Sets self.order integer on all children."""
+        driver = self.driver
+        ordering = driver.rules.ordering
         for child in self.all_children():
-            for rule in self.driver.rules.ordering:
+            # The last matching rule wins, so search from the end
+            for rule in reversed(driver.rules_for_depth(ordering, child.depth())):
                 if child.is_lineage_match(rule.match_rules):
                     child.order_weight = rule.weight
+                    break
         return self
 
     def future(self, config: HConfig) -> HConfig:
@@ -198,14 +236,13 @@ class HConfig(HConfigBase):  # noqa: PLR0904
         exclude_tags: Iterable[str],
     ) -> Iterator[HConfigChild]:
         """Yield all children recursively that match include/exclude tags."""
-        for child in sorted(self.children):
+        for child in self.children.sorted_data():
             yield from child.all_children_sorted_by_tags(include_tags, exclude_tags)
 
     def deep_copy(self) -> HConfig:
         """Return a copy of this object."""
         new_instance = HConfig(self.driver)
-        for child in self.children:
-            new_instance.add_deep_copy_of(child)
+        new_instance._add_deep_copies_of(self.children)
         return new_instance
 
     def _is_duplicate_child_allowed(self) -> bool:  # noqa: PLR6301
@@ -1,4 +1,5 @@
 from collections.abc import Callable
+from functools import cache
 from pathlib import Path
 from typing import Any, Optional, Union
 
@@ -33,18 +34,32 @@ HCONFIG_PLATFORM_V2_TO_V3_MAPPING = {
     "vyos": Platform.VYOS,
 }
 
+# "ios" and "iosxe" both map to CISCO_IOS, so the v2 name it maps back to is
+# chosen here rather than by the order of HCONFIG_PLATFORM_V2_TO_V3_MAPPING.
+HCONFIG_PLATFORM_V3_TO_V2_MAPPING = {
+    Platform.CISCO_IOS: "ios",
+    Platform.CISCO_XR: "iosxr",
+    Platform.CISCO_NXOS: "nxos",
+    Platform.ARISTA_EOS: "eos",
+    Platform.JUNIPER_JUNOS: "junos",
+    Platform.VYOS: "vyos",
+}
+
+# Building a TypeAdapter compiles its validators, so it is only done once
+_TAG_RULES_ADAPTER = TypeAdapter(tuple[TagRule, ...])
+
+# The libyaml backed loader is much faster, but PyYAML can be built without it.
+_YamlSafeLoader = yaml.CSafeLoader if yaml.__with_libyaml__ else yaml.SafeLoader
+
+
+# Checked in this order; the first key with a value becomes the MatchRule.
+_MATCH_RULE_KEYS = ("startswith", "endswith", "contains", "equals", "re_search")
+
 
 def _set_match_rule(lineage: dict[str, Any]) -> Optional[MatchRule]:
-    if startswith := lineage.get("startswith"):
-        return MatchRule(startswith=startswith)
-    if endswith := lineage.get("endswith"):
-        return MatchRule(endswith=endswith)
-    if contains := lineage.get("contains"):
-        return MatchRule(contains=contains)
-    if equals := lineage.get("equals"):
-        return MatchRule(equals=equals)
-    if re_search := lineage.get("re_search"):
-        return MatchRule(re_search=re_search)
+    for key in _MATCH_RULE_KEYS:
+        if value := lineage.get(key):
+            return MatchRule(**{key: value})
 
     return None
 
@@ -62,6 +77,12 @@ def read_text_from_file(file_path: str) -> str:
     return Path(file_path).read_text(encoding="utf-8")
 
 
+def _load_yaml_file(file_path: str) -> Any:  # noqa: ANN401
+    """Parse a YAML file, streaming it from the file handle."""
+    with Path(file_path).open("rb") as yaml_file:
+        return yaml.load(yaml_file, Loader=_YamlSafeLoader)  # noqa: S506
+
+
 def load_hier_config_tags(tags_file: str) -> tuple[TagRule, ...]:
     """Loads and validates Hier Config tags from a YAML file.
 
@@ -72,10 +93,11 @@ def load_hier_config_tags(tags_file: str) -> tuple[TagRule, ...]:
         Tuple[TagRule, ...]: A tuple of validated TagRule objects.
 
     """
-    tags_data = yaml.safe_load(read_text_from_file(file_path=tags_file))
-    return TypeAdapter(tuple[TagRule, ...]).validate_python(tags_data)
+    tags_data = _load_yaml_file(file_path=tags_file)
+    return _TAG_RULES_ADAPTER.validate_python(tags_data)
 
 
+@cache
 def hconfig_v2_os_v3_platform_mapper(os_name: str) -> Platform:
     """Map a Hier Config v2 operating system name to a v3 Platform enumeration.
 
@@ -107,11 +129,7 @@ def hconfig_v3_platform_v2_os_mapper(platform: Platform) -> str:
         "ios"
 
     """
-    for os_name, plat in HCONFIG_PLATFORM_V2_TO_V3_MAPPING.items():
-        if plat == platform:
-            return os_name
-
-    return "generic"
+    return HCONFIG_PLATFORM_V3_TO_V2_MAPPING.get(platform, "generic")
 
 
 def load_hconfig_v2_options(
@@ -130,7 +148,7 @@ def load_hconfig_v2_options(
     """
     # Load options from a file if a string is provided
     if isinstance(v2_options, str):
-        v2_options = yaml.safe_load(read_text_from_file(file_path=v2_options))
+        v2_options = _load_yaml_file(file_path=v2_options)
 
     # Ensure v2_options is a dictionary
     if not isinstance(v2_options, dict):
@@ -267,7 +285,7 @@ def load_hconfig_v2_options_from_file(
         HConfigDriverBase: A v3 driver instance with the migrated rules.
 
     """
-    hconfig_options = yaml.safe_load(read_text_from_file(file_path=options_file))
+    hconfig_options = _load_yaml_file(file_path=options_file)
     return load_hconfig_v2_options(v2_options=hconfig_options, platform=platform)
 
 
@@ -291,7 +309,7 @@ def load_hconfig_v2_tags(
     """
     # Load tags from a file if a string is provided
     if isinstance(v2_tags, str):
-        v2_tags = yaml.safe_load(read_text_from_file(file_path=v2_tags))
+        v2_tags = _load_yaml_file(file_path=v2_tags)
 
     # Ensure v2_tags is a list
     if not isinstance(v2_tags, list):
@@ -314,7 +332,7 @@ def load_hconfig_v2_tags(
             )
 
             # Create the TagRule object
-            v3_tag = TagRule(match_rules=match_rules, apply_tags=frozenset([tags]))
+            v3_tag = TagRule(match_rules=match_rules, apply_tags=frozenset((tags,)))
             v3_tags.append(v3_tag)
 
     return tuple(v3_tags)
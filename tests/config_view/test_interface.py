@@ -1,5 +1,8 @@
+import pytest
+
 from hier_config import get_hconfig, get_hconfig_view
 from hier_config.models import Platform
+from hier_config.platforms.functions import expand_range
 from hier_config.platforms.hp_procurve.functions import hp_procurve_expand_range
 
 
@@ -33,6 +36,15 @@ def test_hp_procurve_expand_range() -> None:
     )
 
 
+def test_expand_range() -> None:
+    assert expand_range("13") == (13,)
+    assert expand_range("2-5,8,22-24") == (2, 3, 4, 5, 8, 22, 23, 24)
+    with pytest.raises(ValueError, match="Invalid range"):
+        expand_range("2-5-8")
+    with pytest.raises(ValueError, match="len"):
+        expand_range("2-5,4")
+
+
 def test_bundle_name() -> None:
     config = get_hconfig(Platform.CISCO_IOS)
     config.add_children_deep(("interface GigabitEthernet1/1/3", "channel-group 1"))
@@ -0,0 +1,195 @@
+import pytest
+
+from hier_config import (
+    get_hconfig,
+    get_hconfig_driver,
+    get_hconfig_fast_load,
+)
+from hier_config.exceptions import DuplicateChildError
+from hier_config.models import (
+    MatchRule,
+    ParentAllowsDuplicateChildRule,
+    Platform,
+)
+
+
+def test_children_index(platform_a: Platform) -> None:
+    config = get_hconfig(platform_a)
+    config.add_children(("a", "b", "c"))
+    b = config.children["b"]
+    c = config.children["c"]
+    assert config.children.index(c) == 2
+    b.delete()
+    assert config.children.index(c) == 1
+    assert tuple(config.get_children(equals="c")) == (c,)
+
+
+def test_children_delete_with_duplicate(platform_a: Platform) -> None:
+    config = get_hconfig(platform_a)
+    first = config.add_child("a")
+    config.add_child("b")
+    second = config.add_child("a", check_if_present=False)
+    first.delete()
+    assert config.children.get("a") is second
+    assert config.children.index(second) == 1
+    assert [c.text for c in config.children] == ["b", "a"]
+
+
+def test_children_delete_unmapped_duplicate(platform_a: Platform) -> None:
+    config = get_hconfig(platform_a)
+    first = config.add_child("a")
+    duplicate = config.add_child("a", check_if_present=False)
+    last = config.add_child("b")
+    duplicate.delete()
+    assert config.children.get("a") is first
+    assert config.children.index(last) == 1
+    assert [c.text for c in config.children] == ["a", "b"]
+
+
+def test_children_delete_text_with_duplicates(platform_a: Platform) -> None:
+    config = get_hconfig(platform_a)
+    config.add_child("a")
+    config.add_child("b")
+    config.add_child("a", check_if_present=False)
+    last = config.add_child("c")
+    config.children.delete("a")
+    assert "a" not in config.children
+    assert config.children.index(last) == 1
+    assert list(config.children.texts()) == ["b", "c"]
+
+
+def test_children_delete_unique_text_beside_duplicates(platform_a: Platform) -> None:
+    config = get_hconfig(platform_a)
+    first = config.add_child("a")
+    config.add_child("b")
+    duplicate = config.add_child("a", check_if_present=False)
+    config.children.delete("b")
+    assert config.children.get("a") is first
+    assert config.children[1] is duplicate
+    assert list(config.children.texts()) == ["a", "a"]
+
+
+def test_children_extend_from_generator(platform_a: Platform) -> None:
+    config = get_hconfig(platform_a)
+    config.add_child("a")
+    source = get_hconfig(platform_a)
+    source.add_children(("a", "b", "c"))
+    config.children.extend(child for child in source.children)
+    assert list(config.children.texts()) == ["a", "a", "b", "c"]
+    assert config.children.get("a") is config.children[0]
+    assert config.children.get("c") is config.children[3]
+    assert config.children.index(config.children[3]) == 3
+
+
+def test_rename_child_updates_mapping(platform_a: Platform) -> None:
+    config = get_hconfig(platform_a)
+    first = config.add_child("a")
+    config.add_child("b")
+    duplicate = config.add_child("a", check_if_present=False)
+    first.text = "c"
+    assert config.children.get("a") is duplicate
+    assert config.children.get("c") is first
+    assert config.children.index(duplicate) == 2
+    duplicate.text = "b"
+    assert "a" not in config.children
+    assert config.children.index(config.children["b"]) == 1
+    assert list(config.children.texts()) == ["c", "b", "b"]
+    first.text = "b"
+    assert config.children.get("b") is first
+
+
+def test_sorted_data_follows_order_weight(platform_a: Platform) -> None:
+    interface = get_hconfig(platform_a).add_child("interface Vlan2")
+    shutdown = interface.add_child("shutdown")
+    description = interface.add_child("description test")
+    assert interface.children.sorted_data() == (shutdown, description)
+    shutdown.order_weight = 100
+    assert interface.children.sorted_data() == (description, shutdown)
+    mtu = interface.add_child("mtu 9000")
+    assert interface.children.sorted_data() == (description, mtu, shutdown)
+    description.delete()
+    assert interface.children.sorted_data() == (mtu, shutdown)
+
+
+def test_eq_with_counted_subtrees(platform_a: Platform) -> None:
+    lines = ("interface Vlan2", "  ip address 192.168.1.1/24", "    test")
+    config_a = get_hconfig_fast_load(platform_a, lines)
+    config_b = get_hconfig_fast_load(platform_a, lines)
+    same = config_a
+    assert config_a == same
+    same_children = config_a.children
+    assert config_a.children == same_children
+    assert len(config_a) == len(config_b)
+    assert config_a == config_b
+    config_b.children[0].children[0].add_child("extra")
+    assert len(config_a) != len(config_b)
+    assert config_a != config_b
+    config_b.children[0].children[0].children.delete("extra")
+    assert len(config_a) == len(config_b)
+    assert config_a == config_b
+
+
+def test_duplicate_child_allowed_after_rename() -> None:
+    config = get_hconfig(Platform.CISCO_XR)
+    route_policy = config.add_child("route-policy test")
+    route_policy.add_child("duplicate")
+    route_policy.add_child("duplicate")
+    assert len(route_policy.children) == 2
+
+    route_policy.text = "interface test"
+    with pytest.raises(DuplicateChildError):
+        route_policy.add_child("duplicate")
+
+
+def test_duplicate_child_allowed_after_rule_added(platform_a: Platform) -> None:
+    driver = get_hconfig_driver(platform_a)
+    policy = get_hconfig(driver).add_child("policy x")
+    policy.add_child("a")
+    policy.add_child("a", return_if_present=True)
+    assert len(policy.children) == 1
+
+    driver.rules.parent_allows_duplicate_child.append(
+        ParentAllowsDuplicateChildRule(match_rules=(MatchRule(startswith="policy"),))
+    )
+    policy.add_child("a")
+    assert len(policy.children) == 2
+
+
+def test_children_delete_while_iterating(platform_a: Platform) -> None:
+    config = get_hconfig_fast_load(
+        platform_a,
+        ("logging host 1", "logging host 2", "logging host 3", "hostname r1"),
+    )
+    for child in config.get_children(startswith="logging host"):
+        child.delete()
+    assert config.dump_simple() == ("hostname r1",)
+
+    config = get_hconfig_fast_load(platform_a, ("a", "b", "c", "d"))
+    for child in config.children:
+        child.delete()
+    assert not config.children
+
+    config = get_hconfig_fast_load(platform_a, ("a", "  b", "  c", "d"))
+    for child in config.all_children():
+        child.delete()
+    assert not config.children
+
+    config = get_hconfig_fast_load(platform_a, ("a", "b", "c"))
+    for child in config.children:
+        config.children.delete(child.text)
+    assert not config.children
+
+
+def test_deep_copy_of_duplicates_into_platform_without_them() -> None:
+    xr_config = get_hconfig_fast_load(
+        Platform.CISCO_XR, ("route-policy test", "  dup", "  dup")
+    )
+    ios_config = get_hconfig(Platform.CISCO_IOS)
+
+    with pytest.raises(DuplicateChildError):
+        ios_config.add_deep_copy_of(xr_config.get_child(equals="route-policy test"))
+
+    copy = get_hconfig(Platform.CISCO_XR).add_deep_copy_of(
+        xr_config.get_child(equals="route-policy test")
+    )
+    assert tuple(child.text for child in copy.children) == ("dup", "dup")
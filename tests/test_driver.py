@@ -1,5 +1,10 @@
-from hier_config import get_hconfig_driver
-from hier_config.models import Platform
+from hier_config import get_hconfig_driver, get_hconfig_fast_load
+from hier_config.models import (
+    MatchRule,
+    OrderingRule,
+    Platform,
+    SectionalOverwriteRule,
+)
 from hier_config.platforms.arista_eos.driver import HConfigDriverAristaEOS
 from hier_config.platforms.cisco_ios.driver import HConfigDriverCiscoIOS
 from hier_config.platforms.cisco_nxos.driver import HConfigDriverCiscoNXOS
@@ -19,3 +24,40 @@ def test_get_hconfig_driver() -> None:
     assert isinstance(get_hconfig_driver(Platform.HP_PROCURVE), HConfigDriverHPProcurve)
     assert isinstance(get_hconfig_driver(Platform.HP_COMWARE5), HConfigDriverHPComware5)
     assert isinstance(get_hconfig_driver(Platform.VYOS), HConfigDriverVYOS)
+
+
+def test_rules_for_depth() -> None:
+    driver = get_hconfig_driver(Platform.GENERIC)
+    rules = driver.rules.sectional_overwrite
+    assert not driver.rules_for_depth(rules, 1)
+    rule = SectionalOverwriteRule(match_rules=(MatchRule(startswith="template"),))
+    rules.append(rule)
+    assert driver.rules_for_depth(rules, 1) == (rule,)
+    assert not driver.rules_for_depth(rules, 2)
+
+
+def test_rules_for_depth_after_rule_replaced() -> None:
+    driver = get_hconfig_driver(Platform.GENERIC)
+    driver.rules.ordering.append(
+        OrderingRule(match_rules=(MatchRule(startswith="x"),), weight=5)
+    )
+    get_hconfig_fast_load(driver, ("x",)).set_order_weight()
+    # Replaced in place, so the length of the list does not change
+    driver.rules.ordering[-1] = OrderingRule(
+        match_rules=(MatchRule(startswith="x"), MatchRule(startswith="y")),
+        weight=7,
+    )
+    config = get_hconfig_fast_load(driver, ("x", "  y")).set_order_weight()
+    assert config.children[0].order_weight == 0
+    assert config.children[0].children[0].order_weight == 7
+    driver.rules.ordering.insert(
+        0,
+        OrderingRule(
+            match_rules=(MatchRule(startswith="x"), MatchRule(startswith="z")),
+            weight=9,
+        ),
+    )
+    driver.rules.ordering.pop()
+    assert [
+        rule.weight for rule in driver.rules_for_depth(driver.rules.ordering, 2)
+    ] == [rule.weight for rule in driver.rules.ordering if len(rule.match_rules) == 2]
@@ -13,7 +13,12 @@ from hier_config import (
     get_hconfig_from_dump,
 )
 from hier_config.exceptions import DuplicateChildError
-from hier_config.models import Instance, MatchRule, Platform
+from hier_config.models import (
+    Instance,
+    MatchRule,
+    OrderingRule,
+    Platform,
+)
 
 
 def test_bool(platform_a: Platform) -> None:
@@ -26,6 +31,49 @@ def test_hash(platform_a: Platform) -> None:
     assert hash(config)
 
 
+def test_root_hash_follows_changes(platform_a: Platform) -> None:
+    config = get_hconfig(platform_a)
+    hashes = {hash(config)}
+    config.add_child("hostname one")
+    hashes.add(hash(config))
+    interface = config.add_child("interface 1/1")
+    hashes.add(hash(config))
+    interface.add_child("untagged vlan 5")
+    hashes.add(hash(config))
+    assert len(hashes) == 4
+
+
+def test_root_tags_follow_changes(platform_a: Platform) -> None:
+    config = get_hconfig(platform_a)
+    interface = config.add_child("interface 1/1")
+    interface.add_child("untagged vlan 5").tags_add("a")
+    assert config.tags == frozenset(("a",))
+    config.add_child("hostname one").tags_add("b")
+    assert config.tags == frozenset(("a", "b"))
+    interface.delete()
+    assert config.tags == frozenset(("b",))
+
+
+def test_len(platform_a: Platform) -> None:
+    config = get_hconfig_fast_load(platform_a, ("interface 1/1", "  untagged vlan 5"))
+    assert len(config) == 2
+    interface = config.get_child(equals="interface 1/1")
+    assert interface is not None
+    interface.add_child("tagged vlan 6")
+    assert len(config) == 3
+    assert len(interface) == 2
+    interface.delete()
+    assert len(config) == 0
+
+
+def test_slots(platform_a: Platform) -> None:
+    config = get_hconfig_fast_load(platform_a, ("interface 1/1", "  untagged vlan 5"))
+    interface = config.children["interface 1/1"]
+    assert not hasattr(config, "__dict__")
+    assert not hasattr(interface, "__dict__")
+    assert not hasattr(interface.children, "__dict__")
+
+
 def test_merge(platform_a: Platform, platform_b: Platform) -> None:
     hier1 = get_hconfig(platform_a)
     hier1.add_child("interface Vlan2")
@@ -40,6 +88,26 @@ def test_merge(platform_a: Platform, platform_b: Platform) -> None:
     assert len(tuple(hier1.all_children())) == 2
 
 
+def test_merge_duplicate_section(platform_a: Platform) -> None:
+    hier1 = get_hconfig_fast_load(platform_a, ("interface Vlan2", "  description a"))
+    hier2 = get_hconfig_fast_load(platform_a, ("interface Vlan3",))
+    hier3 = get_hconfig_fast_load(platform_a, ("interface Vlan3", "  description c"))
+
+    with pytest.raises(DuplicateChildError):
+        hier1.merge((hier2, hier3))
+    # Nothing is merged when any of the sections is a duplicate
+    assert hier1.dump_simple() == ("interface Vlan2", "  description a")
+    with pytest.raises(DuplicateChildError):
+        hier1.merge(hier1.deep_copy())
+
+    hier1.merge(hier3)
+    interface = hier1.get_child(equals="interface Vlan3")
+    assert interface is not None
+    description = interface.get_child(equals="description c")
+    assert description is not None
+    assert description.instances[0].id == hier3.instance_id
+
+
 def test_load_from_file(platform_a: Platform) -> None:
     config = "interface Vlan2\n ip address 1.1.1.1 255.255.255.0"
 
@@ -63,6 +131,17 @@ def test_load_from_config_text(platform_a: Platform) -> None:
     assert len(tuple(hier.all_children())) == 2
 
 
+def test_fast_load_flat_lines(platform_a: Platform) -> None:
+    lines = ("hostname  one", "", "ip routing", "no ip domain-lookup")
+    config = get_hconfig_fast_load(platform_a, lines)
+    assert config.dump_simple() == ("hostname one", "ip routing", "no ip domain-lookup")
+    assert config == get_hconfig(platform_a, "\n".join(lines))
+    assert config.children.get("ip routing") is config.children[1]
+    assert config.children[1].real_indent_level == 0
+    with pytest.raises(DuplicateChildError):
+        get_hconfig_fast_load(platform_a, ("ip routing", "ip  routing"))
+
+
 def test_dump_and_load_from_dump_and_compare(platform_a: Platform) -> None:
     hier_pre_dump = get_hconfig(platform_a)
     b2 = hier_pre_dump.add_children_deep(("a1", "b2"))
@@ -190,6 +269,19 @@ def test_get_children(platform_a: Platform) -> None:
         assert child.text.startswith("interface Vlan")
 
 
+def test_is_match(platform_a: Platform) -> None:
+    child = get_hconfig(platform_a).add_child("interface Vlan2")
+    assert child.is_match()
+    assert child.is_match(equals={"interface Vlan2", "interface Vlan3"})
+    assert not child.is_match(equals={"interface Vlan3"})
+    assert not child.is_match(equals=frozenset(("interface Vlan3",)))
+    assert child.is_match(startswith=("vlan", "interface"), endswith="2")
+    assert child.is_match(contains=("Vlan", "Loopback"))
+    assert not child.is_match(contains="Loopback")
+    assert child.is_match(re_search=r"Vlan\d$")
+    assert not child.is_match(startswith="interface", re_search=r"Vlan3")
+
+
 def test_move(platform_a: Platform, platform_b: Platform) -> None:
     hier1 = get_hconfig(platform_a)
     interface1 = hier1.add_child("interface Vlan2")
@@ -205,6 +297,43 @@ def test_move(platform_a: Platform, platform_b: Platform) -> None:
 
     assert not tuple(hier1.all_children())
     assert len(tuple(hier2.all_children())) == 2
+    assert interface1.parent is hier2
+    for child in hier2.all_children():
+        assert child.root is hier2
+        assert child.driver is hier2.driver
+
+
+def test_move_restamps_lineage(platform_a: Platform) -> None:
+    hier = get_hconfig(platform_a)
+    interface = hier.add_child("interface Vlan2")
+    ip_address = interface.add_child("ip address 192.168.1.1 255.255.255.0")
+    router = hier.add_child("router bgp 1")
+    neighbor = router.add_child("neighbor 10.0.0.1")
+    assert ip_address.indentation == "  "
+
+    interface.move(neighbor)
+
+    assert interface.depth() == 3
+    assert ip_address.depth() == 4
+    assert ip_address.indentation == "      "
+    assert interface.root is hier
+    assert tuple(ip_address.path()) == (
+        "router bgp 1",
+        "neighbor 10.0.0.1",
+        "interface Vlan2",
+        "ip address 192.168.1.1 255.255.255.0",
+    )
+
+
+def test_text_is_interned(platform_a: Platform) -> None:
+    vlan = 2
+    # Built at runtime so that neither text is a shared constant
+    config_a = get_hconfig_fast_load(platform_a, (f"interface Vlan{vlan}",))
+    config_b = get_hconfig_fast_load(platform_a, (f"interface Vlan{vlan}",))
+    assert config_a.children[0].text is config_b.children[0].text
+    config_a.children[0].text = f"interface Vlan{vlan + 1}"
+    config_b.children[0].text = f"interface Vlan{vlan + 1}"
+    assert config_a.children[0].text is config_b.children[0].text
 
 
 def test_del_child_by_text(platform_a: Platform) -> None:
@@ -283,6 +412,30 @@ def test_add_deep_copy_of(platform_a: Platform, platform_b: Platform) -> None:
     assert isinstance(hier2.all_children(), types.GeneratorType)
 
 
+def test_deep_copy(platform_a: Platform) -> None:
+    config = get_hconfig(platform_a)
+    interface = config.add_child("interface Vlan2")
+    description = interface.add_child("description switch-mgmt")
+    description.tags_add("a")
+    description.comments.add("comment")
+    interface.add_child("ip address 192.168.1.1/24").order_weight = -100
+    config.add_child("hostname one")
+
+    config_copy = config.deep_copy()
+
+    assert config_copy == config
+    assert str(config_copy) == str(config)
+    assert config_copy.tags == frozenset(("a",))
+    interface_copy = config_copy.get_child(equals="interface Vlan2")
+    assert interface_copy is not None
+    description_copy = interface_copy.get_child(startswith="description")
+    assert description_copy is not None
+    assert description_copy is not description
+    assert description_copy.comments == {"comment"}
+    assert description_copy.root is config_copy
+    assert config_copy.children.get("interface Vlan2") is config_copy.children[0]
+
+
 def test_path(platform_a: Platform) -> None:
     config_aaa = get_hconfig(platform_a).add_children_deep(("a", "aa", "aaa"))
     assert tuple(config_aaa.path()) == ("a", "aa", "aaa")
@@ -329,6 +482,19 @@ def test_all_children_sorted_by_tags(platform_a: Platform) -> None:
     assert case_3_matches == ["a", "aa", "aaa"]
 
 
+def test_all_children_sorted_by_tags_after_tag_change(platform_a: Platform) -> None:
+    config = get_hconfig(platform_a)
+    config.add_child("a").add_child("aa").tags_add("x")
+    config_ba = config.add_child("b").add_child("ba")
+    include_tags = frozenset(("y",))
+    assert not tuple(config.all_children_sorted_by_tags(include_tags, frozenset()))
+    config_ba.tags_add("y")
+    matches = [
+        c.text for c in config.all_children_sorted_by_tags(include_tags, frozenset())
+    ]
+    assert matches == ["b", "ba"]
+
+
 def test_all_children_sorted(platform_a: Platform) -> None:
     hier = get_hconfig(platform_a)
     interface = hier.add_child("interface Vlan2")
@@ -357,6 +523,33 @@ def test_set_order_weight(platform_a: Platform) -> None:
     assert child.order_weight == 200
 
 
+def test_set_order_weight_last_rule_wins(platform_a: Platform) -> None:
+    driver = get_hconfig_driver(platform_a)
+    driver.rules.ordering.extend(
+        (
+            OrderingRule(match_rules=(MatchRule(startswith="interface"),), weight=10),
+            OrderingRule(match_rules=(MatchRule(startswith="interface 1"),), weight=20),
+            OrderingRule(
+                match_rules=(
+                    MatchRule(startswith="interface"),
+                    MatchRule(startswith="shutdown"),
+                ),
+                weight=30,
+            ),
+        )
+    )
+    hier = get_hconfig(driver)
+    interface_1 = hier.add_child("interface 1/1")
+    interface_2 = hier.add_child("interface 2/1")
+    shutdown = interface_1.add_child("shutdown")
+    description = interface_1.add_child("description test")
+    hier.set_order_weight()
+    assert interface_1.order_weight == 20
+    assert interface_2.order_weight == 10
+    assert shutdown.order_weight == 30
+    assert description.order_weight == 0
+
+
 def test_tags_add(platform_a: Platform) -> None:
     interface = get_hconfig(platform_a).add_child("interface Vlan2")
     ip_address = interface.add_child("ip address 192.168.1.1/24")
@@ -373,6 +566,49 @@ def test_tags_add(platform_a: Platform) -> None:
     assert "c" not in ip_address.tags
 
 
+def test_child_hash_follows_changes(platform_a: Platform) -> None:
+    interface = get_hconfig(platform_a).add_child("interface Vlan2")
+    ip_address = interface.add_child("ip address 192.168.1.1/24")
+    hashes = {hash(interface)}
+    ip_address.text = "ip address 192.168.1.2/24"
+    hashes.add(hash(interface))
+    ip_address.new_in_config = True
+    hashes.add(hash(interface))
+    ip_address.order_weight = 100
+    hashes.add(hash(interface))
+    interface.add_child("shutdown")
+    hashes.add(hash(interface))
+    assert len(hashes) == 5
+
+
+def test_child_eq_compares_leaf_tags(platform_a: Platform) -> None:
+    config_a = get_hconfig(platform_a)
+    config_b = get_hconfig(platform_a)
+    interface_a = config_a.add_child("interface Vlan2")
+    interface_b = config_b.add_child("interface Vlan2")
+    interface_a.add_child("ip address 192.168.1.1/24").tags_add("a")
+    ip_address_b = interface_b.add_child("ip address 192.168.1.1/24")
+    assert interface_a != interface_b
+    ip_address_b.tags_add("a")
+    assert interface_a == interface_b
+    interface_b.add_child("description test")
+    assert interface_a != interface_b
+
+
+def test_tags_after_children_change(platform_a: Platform) -> None:
+    interface = get_hconfig(platform_a).add_child("interface Vlan2")
+    ip_address = interface.add_child("ip address 192.168.1.1/24")
+    ip_address.tags_add("a")
+    assert interface.tags == frozenset(("a",))
+    description = interface.add_child("description test")
+    description.tags = frozenset(("b",))
+    assert interface.tags == frozenset(("a", "b"))
+    ip_address.delete()
+    assert interface.tags == frozenset(("b",))
+    description.delete()
+    assert not interface.tags
+
+
 def test_append_tags(platform_a: Platform) -> None:
     config = get_hconfig(platform_a)
     interface = config.add_child("interface Vlan2")
@@ -444,15 +680,43 @@ def test_add_shallow_copy_of(platform_a: Platform) -> None:
     assert copied_interface.tags == frozenset(("ta", "tb"))
     assert copied_interface.comments == frozenset(("ca",))
     assert copied_interface.order_weight == 200
+    assert base_config.instance_id != interface_a.root.instance_id
     assert copied_interface.instances == [
         Instance(
-            id=id(interface_a.root),
+            id=interface_a.root.instance_id,
             comments=frozenset(interface_a.comments),
             tags=interface_a.tags,
         ),
     ]
 
 
+def test_cisco_style_text_merged(platform_a: Platform) -> None:
+    base_config = get_hconfig(platform_a)
+    interface_a = get_hconfig(platform_a).add_child("interface Vlan2")
+    interface_a.tags_add("ta")
+    interface_a.comments.add("ca")
+    interface_b = get_hconfig(platform_a).add_child("interface Vlan2")
+    interface_b.comments.add("cb")
+
+    merged = base_config.add_shallow_copy_of(interface_a, merged=True)
+    assert merged.cisco_style_text("merged") == "interface Vlan2 !1 instance, ca"
+    merged.instances.append(interface_b.instance)
+    assert merged.cisco_style_text("merged") == "interface Vlan2 !2 instances, ca, cb"
+    assert merged.cisco_style_text("merged", "ta") == "interface Vlan2 !1 instance, ca"
+
+
+def test_cisco_style_text_merged_after_instances_replaced(
+    platform_a: Platform,
+) -> None:
+    child = get_hconfig(platform_a).add_child("interface Vlan2")
+    child.instances.append(Instance(id=1, comments=frozenset(("a",)), tags=frozenset()))
+    assert child.cisco_style_text("merged") == "interface Vlan2 !1 instance, a"
+    child.instances = [Instance(id=2, comments=frozenset(("b",)), tags=frozenset())]
+    assert child.cisco_style_text("merged") == "interface Vlan2 !1 instance, b"
+    child.instances[0] = Instance(id=3, comments=frozenset(("c",)), tags=frozenset())
+    assert child.cisco_style_text("merged") == "interface Vlan2 !1 instance, c"
+
+
 def test_line_inclusion_test(platform_a: Platform) -> None:
     ip_address_ab = get_hconfig(platform_a).add_children_deep(
         ("interface Vlan2", "ip address 192.168.2.1/24"),
@@ -1,5 +1,6 @@
 from hier_config import WorkflowRemediation, get_hconfig, get_hconfig_fast_load
 from hier_config.models import Platform
+from hier_config.platforms.functions import convert_to_set_commands
 
 
 def test_junos_basic_remediation() -> None:
@@ -47,3 +48,21 @@ def test_flat_junos_remediation(
     remediation_list = remediation_config_flat_junos.splitlines()
     for line in str(workflow_remediation.remediation_config).splitlines():
         assert line in remediation_list
+
+
+def test_convert_to_set_commands_keeps_inner_semicolons() -> None:
+    config_raw = (
+        "system {\n"
+        '    host-name "a;b";\n'
+        "    domain-name example.com ;\n"
+        "    services {\n"
+        "        ssh;\n"
+        "    }\n"
+        "}"
+    )
+
+    assert convert_to_set_commands(config_raw) == (
+        'set system host-name "a;b"\n'
+        "set system domain-name example.com\n"
+        "set system services ssh"
+    )
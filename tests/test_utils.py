@@ -11,6 +11,7 @@ from hier_config.models import (
     TagRule,
 )
 from hier_config.utils import (
+    HCONFIG_PLATFORM_V2_TO_V3_MAPPING,
     hconfig_v2_os_v3_platform_mapper,
     hconfig_v3_platform_v2_os_mapper,
     load_hconfig_v2_options,
@@ -109,6 +110,12 @@ def test_hconfig_v3_platform_v2_os_mapper() -> None:
     assert hconfig_v3_platform_v2_os_mapper(Platform.GENERIC) == "generic"
 
 
+def test_hconfig_platform_mappings_round_trip() -> None:
+    for platform in HCONFIG_PLATFORM_V2_TO_V3_MAPPING.values():
+        os_name = hconfig_v3_platform_v2_os_mapper(platform)
+        assert hconfig_v2_os_v3_platform_mapper(os_name) == platform
+
+
 def test_load_hconfig_v2_options(
     platform_generic: Platform, v2_options: dict[str, Any]
 ) -> None: